@@ -1,4 +1,7 @@
 import os
+import sys
+import hashlib
+import importlib.util
 import subprocess
 import time
 import shutil
@@ -13,10 +16,28 @@ EVIDENCE_OUTPUT_DIR = os.path.join(BASE_DIR, '..', 'output', 'test')
 STREAM_SERVER_SCRIPT = os.path.join(DATA_DIR, 'streaming-server', 'stream_server.py')
 EVENT_PROCESSOR_SCRIPT = os.path.join(SRC_DIR, 'main.py')
 DASHBOARD_REQUIREMENTS = os.path.join(SRC_DIR, 'dashboard', 'requirements.txt')
+# Records the requirements hash of the last successful install so reruns can skip pip
+DEPS_MARKER_FILE = os.path.join(SRC_DIR, 'dashboard', '.deps.ok')
 
 OUTPUT_EVENTS_FILE = os.path.join(BASE_DIR, '..', '..', 'events.jsonl')
 FINAL_EVENTS_FILE = os.path.join(EVIDENCE_OUTPUT_DIR, 'events.jsonl')
 
+# --- Helpers ---
+def requirements_hash():
+    """Hashes the requirements file together with the interpreter it is installed into."""
+    with open(DASHBOARD_REQUIREMENTS, 'rb') as f:
+        return hashlib.sha256(f.read() + sys.executable.encode('utf-8')).hexdigest()
+
+def dependencies_installed(req_hash):
+    """Checks whether the dashboard dependencies were already installed for these requirements."""
+    if importlib.util.find_spec('flask') is None:
+        return False
+    try:
+        with open(DEPS_MARKER_FILE, 'r') as f:
+            return f.read().strip() == req_hash
+    except FileNotFoundError:
+        return False
+
 # --- Main Automation Logic ---
 def run_demo():
     """
@@ -28,14 +49,20 @@ def run_demo():
     os.makedirs(EVIDENCE_OUTPUT_DIR, exist_ok=True)
     print(f"Ensured output directory exists: {EVIDENCE_OUTPUT_DIR}")
 
-    # 2. Install dependencies
-    print("Installing dashboard dependencies...")
-    try:
-        subprocess.run(['pip', 'install', '-r', DASHBOARD_REQUIREMENTS], check=True)
-        print("Dependencies installed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to install dependencies: {e}")
-        return
+    # 2. Install dependencies, unless this exact requirements set is already in place
+    req_hash = requirements_hash()
+    if dependencies_installed(req_hash):
+        print("Dashboard dependencies already installed, skipping pip.")
+    else:
+        print("Installing dashboard dependencies...")
+        try:
+            subprocess.run([sys.executable, '-m', 'pip', 'install', '-r', DASHBOARD_REQUIREMENTS], check=True)
+            print("Dependencies installed successfully.")
+        except subprocess.CalledProcessError as e:
+            print(f"Failed to install dependencies: {e}")
+            return
+        with open(DEPS_MARKER_FILE, 'w') as f:
+            f.write(req_hash)
 
     # 3. Start the streaming server in the background
     print(f"Starting the stream server from: {STREAM_SERVER_SCRIPT}")
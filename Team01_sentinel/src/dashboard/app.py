@@ -1,7 +1,13 @@
 import json
 import os
+import threading
 from flask import Flask, jsonify, render_template
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 app = Flask(__name__)
 
 # --- Configuration ---
@@ -9,22 +15,65 @@ app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 EVENTS_FILE = os.path.join(BASE_DIR, '..', '..', 'events.jsonl')
 
+# How many bytes at the start of the file and just before the read offset are kept
+# to recognise a file that a new run rewrote
+CHECK_BYTES = 256
+
+# Parsed events, plus the file signature, check bytes and byte offset they were read up to
+_cache = {'sig': None, 'head': b'', 'tail': b'', 'offset': 0, 'events': []}
+_cache_lock = threading.Lock()
+
 def get_events():
-    """Reads events from the JSONL file."""
-    events = []
+    """Reads events from the JSONL file, parsing only lines appended since the last call."""
     try:
-        with open(EVENTS_FILE, 'r') as f:
-            for line in f:
-                try:
-                    events.append(json.loads(line))
-                except json.JSONDecodeError:
-                    # Log or handle corrupted lines if necessary
-                    pass
+        st = os.stat(EVENTS_FILE)
     except FileNotFoundError:
         # Handle case where the file doesn't exist yet
         print(f"File not found: {EVENTS_FILE}")
-        pass
-    return events
+        return []
+
+    sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        if sig == _cache['sig']:
+            return _cache['events']
+
+        try:
+            with open(EVENTS_FILE, 'rb') as f:
+                head = f.read(CHECK_BYTES)
+                f.seek(_cache['offset'] - len(_cache['tail']))
+                tail = f.read(len(_cache['tail']))
+                # A new run replaced or truncated the file, possibly growing it past our
+                # offset since the last poll; start over
+                replaced = _cache['sig'] is not None and st.st_ino != _cache['sig'][0]
+                if replaced or head[:len(_cache['head'])] != _cache['head'] or tail != _cache['tail']:
+                    _cache['offset'] = 0
+                    _cache['tail'] = b''
+                    _cache['events'] = []
+                f.seek(_cache['offset'])
+                chunk = f.read()
+        except FileNotFoundError:
+            print(f"File not found: {EVENTS_FILE}")
+            return []
+
+        # Leave a partially written last line for the next call
+        end = chunk.rfind(b'\n') + 1
+        new_events = []
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                new_events.append(json_loads(line))
+            except json.JSONDecodeError:
+                # Log or handle corrupted lines if necessary
+                pass
+
+        # Build a new list so responses still rendering the old one are unaffected
+        _cache['events'] = _cache['events'] + new_events
+        _cache['offset'] += end
+        _cache['head'] = head[:_cache['offset']]
+        _cache['tail'] = (_cache['tail'] + chunk[:end])[-CHECK_BYTES:]
+        _cache['sig'] = sig
+        return _cache['events']
 
 @app.route('/')
 def index():
@@ -37,4 +86,4 @@ def data():
     return jsonify(get_events())
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
\ No newline at end of file
+    app.run(debug=True, port=5001)
@@ -1,8 +1,22 @@
+import atexit
 import socket
+import signal
+import threading
+import queue
+import time
 import json
 import csv
+import re
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from collections import defaultdict
+from functools import lru_cache
+
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:
+    json_loads = json.loads
+    def json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
 
 # --- Configuration ---
 HOST = '127.0.0.1'
@@ -11,17 +25,85 @@ OUTPUT_FILE = 'events.jsonl'
 ERROR_LOG_FILE = 'error.log'
 PRODUCT_DATA_FILE = 'data/input/products_list.csv'
 INVENTORY_SNAPSHOT_FILE = 'data/input/inventory_snapshots.jsonl'
+OUTPUT_BUFFER_SIZE = 1 << 16
+OUTPUT_FLUSH_INTERVAL = 1.0  # seconds between flushes so the dashboard stays current
+RECV_CHUNK_SIZE = 1 << 16
+JSON_OPENERS = (b'{', b'[')
+# Peeks at a frame's dataset name without a full JSON parse; the stream server puts it first.
+DATASET_RE = re.compile(rb'"dataset":\s*"([^"]+)"')
+DATASET_PEEK_BYTES = 200
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Maximum gap between a station read and the POS scan it is checked against, in microseconds.
+WINDOW_US = 5_000_000
+
+# Detectors return a sequence of (event_name, encoded_line) pairs; this is the
+# shared "no events" result so they don't allocate on the common path.
+NO_EVENTS = ()
+
+# Read-only default for missing payloads, so lookups don't build a throwaway dict.
+EMPTY_DICT = MappingProxyType({})
+
+# Pre-serialised lines for the high-volume queue events; %b slots take JSON-encoded values.
+LONG_QUEUE_TEMPLATE = b'{"timestamp":%b,"event_id":"E005","event_data":{"event_name":"Long Queue Length","station_id":%b,"num_of_customers":%b}}\n'
+LONG_WAIT_TEMPLATE = b'{"timestamp":%b,"event_id":"E006","event_data":{"event_name":"Long Wait Time","station_id":%b,"wait_time_seconds":%b}}\n'
 
 # --- State Tracking ---
-last_rfid_reads = defaultdict(lambda: {'datetime': None, 'sku': None})
-last_product_recognition = defaultdict(lambda: {'datetime': None, 'sku': None})
-inventory_levels = {}
+station_state = {}  # station_id -> {'rfid': (t_us, sku_id), 'vision': (t_us, predicted_sku_id)}
+error_log = None  # opened on first use and kept open
+sku_ids = {}  # catalog sku -> dense integer id
+sku_names = []  # sku_id -> sku, for turning ids back into event fields
+inventory_levels = []  # sku_id -> tracked stock count, None for SKUs missing from the initial snapshot
 
 # --- Utility Functions ---
 def log_error(message):
     """Writes an error message to the error log file."""
-    with open(ERROR_LOG_FILE, 'a') as f:
-        f.write(f"[{datetime.now()}] {message}\n")
+    global error_log
+    if error_log is None:
+        # Line-buffered append handle: one write per message instead of open/write/close.
+        error_log = open(ERROR_LOG_FILE, 'a', buffering=1)
+        atexit.register(error_log.close)
+    error_log.write(f"[{datetime.now()}] {message}\n")
+
+def handle_sigterm(signum, frame):
+    """Treats termination like Ctrl+C so buffered events are flushed on exit."""
+    raise KeyboardInterrupt
+
+def write_events(pending, path):
+    """Drains encoded event lines from the queue into the output file until it receives None."""
+    with open(path, 'ab', buffering=OUTPUT_BUFFER_SIZE) as outfile:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                encoded = pending.get(timeout=OUTPUT_FLUSH_INTERVAL)
+            except queue.Empty:
+                # Stream is quiet; push out whatever is buffered for the dashboard.
+                outfile.flush()
+                last_flush = time.monotonic()
+                continue
+            if encoded is None:
+                break
+            outfile.write(encoded)
+            if (now := time.monotonic()) - last_flush >= OUTPUT_FLUSH_INTERVAL:
+                outfile.flush()
+                last_flush = now
+
+def read_lines(sock):
+    """Yields newline-delimited records from the socket as raw bytes."""
+    # Receive into one preallocated buffer instead of allocating a bytes object per recv.
+    recv_buf = memoryview(bytearray(RECV_CHUNK_SIZE))
+    buf = bytearray()
+    while n := sock.recv_into(recv_buf):
+        buf += recv_buf[:n]
+        start = 0
+        while (end := buf.find(b'\n', start)) != -1:
+            yield bytes(buf[start:end])
+            start = end + 1
+        del buf[:start]
+    if buf:
+        yield bytes(buf)
 
 # --- Data Loading ---
 def load_csv_data(filepath):
@@ -39,130 +121,173 @@ def load_csv_data(filepath):
     return data
 
 def load_initial_inventory():
-    global inventory_levels
     try:
-        with open(INVENTORY_SNAPSHOT_FILE, 'r') as f:
-            snapshot = json.load(f)
-            inventory_levels = snapshot.get('data', {})
+        with open(INVENTORY_SNAPSHOT_FILE, 'rb') as f:
+            snapshot = json_loads(f.read())
+            for sku, count in snapshot.get('data', {}).items():
+                if (sku_id := register_sku(sku)) is not None:
+                    inventory_levels[sku_id] = count
     except (FileNotFoundError, json.JSONDecodeError) as e:
         log_error(f"FATAL: Could not load initial inventory: {e}")
 
+def build_weight_bounds(products):
+    """Precomputes (expected, min, max) catalog weights so the hot path skips float parsing."""
+    weight_bounds = {}
+    for sku, row in products.items():
+        try:
+            expected_weight = float(row['weight'])
+        except (ValueError, KeyError, TypeError) as e:
+            log_error(f"Could not process weight for SKU {sku}: {e}")
+            continue
+        weight_bounds[sku] = (expected_weight, expected_weight * 0.95, expected_weight * 1.05)
+    return weight_bounds
+
+# Adjacent stream records often share a timestamp, so keep recent parses around.
+@lru_cache(maxsize=4096)
+def parse_epoch_us(timestamp):
+    """Parses an ISO timestamp to integer microseconds since the epoch."""
+    return (datetime.fromisoformat(timestamp) - EPOCH) // ONE_MICROSECOND
+
+def register_sku(sku):
+    """Gives a catalog or inventory SKU a dense integer id at load time."""
+    if not sku: return None
+    sku_id = sku_ids.get(sku)
+    if sku_id is None:
+        sku_id = sku_ids[sku] = len(sku_names)
+        sku_names.append(sku)
+        inventory_levels.append(None)
+    return sku_id
+
+def intern_sku(sku):
+    """Maps a streamed SKU to its integer id so hot-path comparisons are int compares.
+    SKUs outside the catalog come back as strings, so stream input never grows the tables."""
+    if not sku: return None
+    sku_id = sku_ids.get(sku)
+    return sku_id if sku_id is not None else str(sku)
+
+def sku_name(sku_id):
+    """Turns an id from intern_sku back into the SKU string."""
+    return sku_names[sku_id] if isinstance(sku_id, int) else sku_id
+
+def encode_event(event):
+    """Serialises an event dict to a JSONL line, paired with its name for console output."""
+    return (event['event_data']['event_name'], json_dumps(event) + b'\n')
+
 # --- Event Detection Algorithms ---
 
-# @algorithm Scanner Avoidance | Detects when an item is read by RFID but not scanned at POS.
-def detect_scanner_avoidance(stream_data):
+def track_station_reads(stream_data):
+    """Records the latest RFID and vision reads per station and checks each POS scan against both."""
     dataset = stream_data.get('dataset')
-    event_payload = stream_data.get('event', {})
+    event_payload = stream_data.get('event', EMPTY_DICT)
     station_id = event_payload.get('station_id')
-    if not station_id: return None
+    if not station_id: return NO_EVENTS
 
+    data = event_payload.get('data', EMPTY_DICT)
     if dataset == 'RFID_data':
-        if event_payload.get('data', {}).get('location') == 'IN_SCAN_AREA':
-            last_rfid_reads[station_id] = {
-                'datetime': stream_data.get('datetime'),
-                'sku': event_payload.get('data', {}).get('sku')
-            }
-    elif dataset == 'POS_Transactions':
-        pos_data = event_payload.get('data', {})
-        last_read = last_rfid_reads[station_id]
-        if last_read.get('sku') and last_read.get('sku') != pos_data.get('sku'):
-            if stream_data.get('datetime') and last_read.get('datetime'):
-                if stream_data['datetime'] - last_read['datetime'] < timedelta(seconds=5):
-                    return {"timestamp": stream_data['timestamp'], "event_id": "E001", "event_data": {"event_name": "Scanner Avoidance", "station_id": station_id, "customer_id": pos_data.get('customer_id'), "product_sku": last_read['sku']}}
+        if data.get('location') == 'IN_SCAN_AREA':
+            station_state.setdefault(station_id, {})['rfid'] = (stream_data.get('t_us'), intern_sku(data.get('sku')))
+    elif dataset == 'Product_recognism':
+        station_state.setdefault(station_id, {})['vision'] = (stream_data.get('t_us'), intern_sku(data.get('predicted_product')))
+    elif dataset == 'POS_Transactions' and (state := station_state.get(station_id)):
+        pos_sku_id = intern_sku(data.get('sku'))
+        events = []
+        if event := detect_scanner_avoidance(stream_data, station_id, data, pos_sku_id, state.get('rfid')):
+            events.append(encode_event(event))
+        if event := detect_barcode_switching(stream_data, station_id, data, pos_sku_id, state.get('vision')):
+            events.append(encode_event(event))
+        return events
+    return NO_EVENTS
+
+def is_recent_mismatch(stream_data, pos_sku_id, last_read):
+    """Checks whether a station read names a different SKU than the POS scan within WINDOW_US."""
+    if not last_read: return False
+    read_time, read_sku_id = last_read
+    if read_sku_id is not None and read_sku_id != pos_sku_id:
+        if (now_us := stream_data.get('t_us')) is not None and read_time is not None:
+            return now_us - read_time < WINDOW_US
+    return False
+
+# @algorithm Scanner Avoidance | Detects when an item is read by RFID but not scanned at POS.
+def detect_scanner_avoidance(stream_data, station_id, pos_data, pos_sku_id, last_read):
+    if is_recent_mismatch(stream_data, pos_sku_id, last_read):
+        return {"timestamp": stream_data['timestamp'], "event_id": "E001", "event_data": {"event_name": "Scanner Avoidance", "station_id": station_id, "customer_id": pos_data.get('customer_id'), "product_sku": sku_name(last_read[1])}}
     return None
 
 # @algorithm Inventory Discrepancy | Detects differences between tracked and actual inventory.
 def detect_inventory_discrepancy(stream_data):
-    global inventory_levels
     dataset = stream_data.get('dataset')
-    event_payload = stream_data.get('event', {})
+    data = stream_data.get('event', EMPTY_DICT).get('data', EMPTY_DICT)
 
     if dataset == 'POS_Transactions':
-        if sku := event_payload.get('data', {}).get('sku'):
-            if sku in inventory_levels: inventory_levels[sku] -= 1
+        if (sku_id := sku_ids.get(data.get('sku'))) is not None:
+            if (count := inventory_levels[sku_id]) is not None: inventory_levels[sku_id] = count - 1
     elif dataset == 'Current_inventory_data':
-        snapshot_data = event_payload.get('data', {})
-        for sku, actual_count in snapshot_data.items():
-            if (expected := inventory_levels.get(sku)) is not None and abs(expected - actual_count) > 5:
-                inventory_levels[sku] = actual_count # Resync
-                return {"timestamp": stream_data['timestamp'], "event_id": "E007", "event_data": {"event_name": "Inventory Discrepancy", "SKU": sku, "Expected_Inventory": expected, "Actual_Inventory": actual_count}}
-    return None
+        events = []
+        for sku, actual_count in data.items():
+            sku_id = sku_ids.get(sku)
+            if sku_id is not None and (expected := inventory_levels[sku_id]) is not None and abs(expected - actual_count) > 5:
+                inventory_levels[sku_id] = actual_count # Resync
+                events.append(encode_event({"timestamp": stream_data['timestamp'], "event_id": "E007", "event_data": {"event_name": "Inventory Discrepancy", "SKU": sku, "Expected_Inventory": expected, "Actual_Inventory": actual_count}}))
+        return events
+    return NO_EVENTS
 
 # @algorithm Long Queue Length | Detects when the number of customers in a queue exceeds a threshold.
 def detect_long_queue(stream_data):
     if stream_data.get('dataset') == 'Queue_monitor':
-        event_payload = stream_data.get('event', {})
-        if (count := event_payload.get('data', {}).get('customer_count', 0)) > 5:
-            return {"timestamp": stream_data['timestamp'], "event_id": "E005", "event_data": {"event_name": "Long Queue Length", "station_id": event_payload['station_id'], "num_of_customers": count}}
-    return None
+        event_payload = stream_data.get('event', EMPTY_DICT)
+        if (count := event_payload.get('data', EMPTY_DICT).get('customer_count', 0)) > 5:
+            return [("Long Queue Length", LONG_QUEUE_TEMPLATE % (json_dumps(stream_data['timestamp']), json_dumps(event_payload['station_id']), json_dumps(count)))]
+    return NO_EVENTS
 
 # @algorithm Long Wait Time | Detects when the average customer wait time exceeds a threshold.
 def detect_long_wait_time(stream_data):
     if stream_data.get('dataset') == 'Queue_monitor':
-        event_payload = stream_data.get('event', {})
-        if (dwell := event_payload.get('data', {}).get('average_dwell_time', 0)) > 300:
-            return {"timestamp": stream_data['timestamp'], "event_id": "E006", "event_data": {"event_name": "Long Wait Time", "station_id": event_payload['station_id'], "wait_time_seconds": dwell}}
-    return None
+        event_payload = stream_data.get('event', EMPTY_DICT)
+        if (dwell := event_payload.get('data', EMPTY_DICT).get('average_dwell_time', 0)) > 300:
+            return [("Long Wait Time", LONG_WAIT_TEMPLATE % (json_dumps(stream_data['timestamp']), json_dumps(event_payload['station_id']), json_dumps(dwell)))]
+    return NO_EVENTS
 
 # @algorithm Weight Discrepancies | Detects when the weight of a scanned item differs from its expected weight.
-def detect_weight_discrepancy(stream_data, products):
+def detect_weight_discrepancy(stream_data, weight_bounds):
     """Compares transaction weight with product catalog weight."""
     if stream_data.get('dataset') == 'POS_Transactions':
-        event_payload = stream_data.get('event', {})
-        pos_data = event_payload.get('data', {})
+        event_payload = stream_data.get('event', EMPTY_DICT)
+        pos_data = event_payload.get('data', EMPTY_DICT)
         sku = pos_data.get('sku')
         actual_weight = pos_data.get('weight_g')
 
-        if sku and actual_weight is not None and sku in products:
-            try:
-                expected_weight = float(products[sku]['weight'])
-                if not (expected_weight * 0.95 <= actual_weight <= expected_weight * 1.05):
-                    return {
-                        "timestamp": stream_data['timestamp'],
-                        "event_id": "E003",
-                        "event_data": {
-                            "event_name": "Weight Discrepancies",
-                            "station_id": event_payload.get('station_id'),
-                            "customer_id": pos_data.get('customer_id'),
-                            "product_sku": sku,
-                            "expected_weight": expected_weight,
-                            "actual_weight": actual_weight
-                        }
+        if actual_weight is not None and (bounds := weight_bounds.get(sku)):
+            expected_weight, min_weight, max_weight = bounds
+            if not (min_weight <= actual_weight <= max_weight):
+                return [encode_event({
+                    "timestamp": stream_data['timestamp'],
+                    "event_id": "E003",
+                    "event_data": {
+                        "event_name": "Weight Discrepancies",
+                        "station_id": event_payload.get('station_id'),
+                        "customer_id": pos_data.get('customer_id'),
+                        "product_sku": sku,
+                        "expected_weight": expected_weight,
+                        "actual_weight": actual_weight
                     }
-            except (ValueError, KeyError) as e:
-                log_error(f"Could not process weight for SKU {sku}: {e}")
-    return None
+                })]
+    return NO_EVENTS
 
 # @algorithm Barcode Switching | Detects when a vision system prediction is followed by a different item scan.
-def detect_barcode_switching(stream_data):
+def detect_barcode_switching(stream_data, station_id, pos_data, pos_sku_id, last_rec):
     """Detects potential barcode switching using vision and POS data."""
-    dataset = stream_data.get('dataset')
-    event_payload = stream_data.get('event', {})
-    station_id = event_payload.get('station_id')
-    if not station_id: return None
-
-    if dataset == 'Product_recognism':
-        last_product_recognition[station_id] = {
-            'datetime': stream_data.get('datetime'),
-            'sku': event_payload.get('data', {}).get('predicted_product')
+    if is_recent_mismatch(stream_data, pos_sku_id, last_rec):
+        return {
+            "timestamp": stream_data['timestamp'],
+            "event_id": "E002",
+            "event_data": {
+                "event_name": "Barcode Switching",
+                "station_id": station_id,
+                "customer_id": pos_data.get('customer_id'),
+                "actual_sku": sku_name(last_rec[1]),
+                "scanned_sku": pos_data.get('sku')
+            }
         }
-    elif dataset == 'POS_Transactions':
-        pos_data = event_payload.get('data', {})
-        last_rec = last_product_recognition[station_id]
-        if last_rec.get('sku') and last_rec.get('sku') != pos_data.get('sku'):
-            if stream_data.get('datetime') and last_rec.get('datetime'):
-                if stream_data['datetime'] - last_rec['datetime'] < timedelta(seconds=5):
-                    return {
-                        "timestamp": stream_data['timestamp'],
-                        "event_id": "E002",
-                        "event_data": {
-                            "event_name": "Barcode Switching",
-                            "station_id": station_id,
-                            "customer_id": pos_data.get('customer_id'),
-                            "actual_sku": last_rec['sku'],
-                            "scanned_sku": pos_data.get('sku')
-                        }
-                    }
     return None
 
 # --- Main Application Logic ---
@@ -173,48 +298,68 @@ def main():
     if not products or not inventory_levels:
         print("FATAL: Failed to load critical data. Exiting.")
         return
+    for sku in products:
+        register_sku(sku)
 
     # Clear previous log files
     open(OUTPUT_FILE, 'w').close()
     open(ERROR_LOG_FILE, 'w').close()
 
-    detectors = [
-        detect_scanner_avoidance,
-        detect_inventory_discrepancy,
-        detect_long_queue,
-        detect_long_wait_time,
-        lambda stream_data: detect_weight_discrepancy(stream_data, products),
-        detect_barcode_switching
-    ]
+    weight_bounds = build_weight_bounds(products)
+    detect_weight = lambda stream_data: detect_weight_discrepancy(stream_data, weight_bounds)
+
+    # Route each record only to the detectors that care about its dataset.
+    detectors_by_dataset = {
+        'RFID_data': [track_station_reads],
+        'POS_Transactions': [track_station_reads, detect_inventory_discrepancy, detect_weight],
+        'Queue_monitor': [detect_long_queue, detect_long_wait_time],
+        'Product_recognism': [track_station_reads],
+        'Current_inventory_data': [detect_inventory_discrepancy]
+    }
+    known_datasets = {name.encode('utf-8') for name in detectors_by_dataset}
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    # Writes happen on a background thread so detection never waits on file I/O.
+    pending = queue.SimpleQueue()
+    writer = threading.Thread(target=write_events, args=(pending, OUTPUT_FILE), name='event-writer')
+    writer.start()
 
     print(f"Connecting to stream at {HOST}:{PORT}...")
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s, open(OUTPUT_FILE, 'a') as outfile:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.connect((HOST, PORT))
-            sock_file = s.makefile('r', encoding='utf-8')
+            lines = read_lines(s)
             print("Connection successful.")
 
             # The first line is a banner, read and discard it.
-            banner = sock_file.readline()
-            print(f"Skipped banner: {banner.strip()}")
+            banner = next(lines, b'')
+            print(f"Skipped banner: {banner.decode('utf-8', 'replace').strip()}")
 
             # Process the stream line by line
-            for line in sock_file:
+            for line in lines:
+                # Filter blank and non-JSON lines here rather than paying for a decode exception.
+                line = line.strip()
+                if line[:1] not in JSON_OPENERS:
+                    if line:
+                        log_error(f"Skipping non-JSON line: '{line.decode('utf-8', 'replace')}'")
+                    continue
+                # Don't bother parsing records that no detector handles.
+                if (match := DATASET_RE.search(line, 0, DATASET_PEEK_BYTES)) and match.group(1) not in known_datasets:
+                    continue
                 try:
-                    stream_data = json.loads(line)
+                    stream_data = json_loads(line)
 
                     if 'timestamp' in stream_data:
-                        stream_data['datetime'] = datetime.strptime(stream_data['timestamp'], "%Y-%m-%dT%H:%M:%S")
+                        stream_data['t_us'] = parse_epoch_us(stream_data['timestamp'])
 
-                    for detector in detectors:
-                        event = detector(stream_data)
-                        if event:
-                            print(f"EVENT DETECTED: {event['event_data']['event_name']}")
-                            outfile.write(json.dumps(event) + '\n')
-                            outfile.flush()
+                    for detector in detectors_by_dataset.get(stream_data.get('dataset'), ()):
+                        for event_name, encoded in detector(stream_data):
+                            print(f"EVENT DETECTED: {event_name}")
+                            pending.put(encoded)
 
                 except json.JSONDecodeError as e:
-                    log_error(f"JSON decode error on line: '{line.strip()}'. Error: {e}")
+                    log_error(f"JSON decode error on line: '{line.decode('utf-8', 'replace')}'. Error: {e}")
                 except Exception as e:
                     log_error(f"An unexpected error occurred: {e}")
 
@@ -223,6 +368,8 @@ def main():
     except KeyboardInterrupt:
         print("\nExiting...")
     finally:
+        pending.put(None)
+        writer.join()
         print("Processing complete.")
 
 if __name__ == "__main__":
@@ -3,12 +3,46 @@
 
 import json
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Tuple
+from datetime import date, datetime
+from functools import lru_cache
+from operator import itemgetter
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    from ciso8601 import parse_datetime as fromisoformat
+except ImportError:
+    fromisoformat = datetime.fromisoformat
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# First byte of any line worth handing to the JSON parser
+JSON_OPENERS = (b'{', b'[')
+
+# Payload fields a record must carry to take part in SKU correlation: the
+# fields a detector compares on, not ones it only copies into an event
+REQUIRED_FIELDS = {
+    'pos_transactions': frozenset(('sku',)),
+    'rfid_readings': frozenset(('sku',)),
+    'product_recognition': frozenset(('predicted_product', 'accuracy')),
+}
+
+# Payload fields exposed as columns for each event stream
+STREAM_FIELDS = {
+    'pos_transactions': ('customer_id', 'sku', 'weight_g'),
+    'rfid_readings': ('location', 'sku'),
+    'queue_monitoring': ('customer_count', 'average_dwell_time'),
+    'product_recognition': ('predicted_product', 'accuracy'),
+}
 
 
 def load_jsonl(file_path: Path) -> List[Dict[str, Any]]:
-    """Load events from a JSONL file.
+    """Load events from a JSONL file, skipping blank and non-JSON lines.
     
     Args:
         file_path: Path to the JSONL file
@@ -17,11 +51,11 @@ def load_jsonl(file_path: Path) -> List[Dict[str, Any]]:
         List of event dictionaries
     """
     events = []
-    with open(file_path, 'r', encoding='utf-8') as f:
+    with open(file_path, 'rb') as f:
         for line in f:
             line = line.strip()
-            if line:
-                events.append(json.loads(line))
+            if line[:1] in JSON_OPENERS:
+                events.append(json_loads(line))
     return events
 
 
@@ -44,6 +78,7 @@ def load_csv(file_path: Path) -> List[Dict[str, Any]]:
     return data
 
 
+@lru_cache(maxsize=4096)
 def parse_timestamp(ts_str: str) -> datetime:
     """Parse timestamp string to datetime object.
     
@@ -53,7 +88,51 @@ def parse_timestamp(ts_str: str) -> datetime:
     Returns:
         datetime object
     """
-    return datetime.fromisoformat(ts_str)
+    return fromisoformat(ts_str)
+
+
+def parse_epoch(ts_str: str) -> float:
+    """Parse timestamp string to seconds since the Unix epoch.
+    
+    Args:
+        ts_str: Timestamp string in ISO format
+        
+    Returns:
+        Seconds since 1970-01-01T00:00:00 UTC as a float; timestamps without
+        a UTC offset are taken to be UTC
+    """
+    # Fast path for the plain YYYY-MM-DDTHH:MM:SS form the streams use
+    if len(ts_str) == 19 and ts_str[4] == '-' and ts_str[13] == ':' and ts_str[16] == ':':
+        day = date(int(ts_str[0:4]), int(ts_str[5:7]), int(ts_str[8:10]))
+        seconds = int(ts_str[11:13]) * 3600 + int(ts_str[14:16]) * 60 + int(ts_str[17:19])
+        return float((day.toordinal() - EPOCH_ORDINAL) * 86400 + seconds)
+    
+    parsed = parse_timestamp(ts_str)
+    if parsed.tzinfo is not None:
+        return parsed.timestamp()
+    return (parsed - EPOCH).total_seconds()
+
+
+def to_columns(events: List[Dict[str, Any]], epochs: List[float], fields: Tuple[str, ...]) -> Dict[str, List[Any]]:
+    """Convert a list of events into a column-oriented dict of parallel lists.
+    
+    Args:
+        events: Event dictionaries
+        epochs: Epoch seconds for each event
+        fields: Keys of the event ``data`` payload to extract as columns
+        
+    Returns:
+        Dictionary mapping column name to a list aligned with ``events``
+    """
+    columns = {
+        'timestamp': [event['timestamp'] for event in events],
+        'epoch': epochs,
+        'station_id': [event.get('station_id') for event in events],
+    }
+    payloads = [event['data'] for event in events]
+    for field in fields:
+        columns[field] = [payload.get(field) for payload in payloads]
+    return columns
 
 
 def load_all_data(data_dir: Path) -> Dict[str, Any]:
@@ -63,7 +142,13 @@ def load_all_data(data_dir: Path) -> Dict[str, Any]:
         data_dir: Path to the input data directory
         
     Returns:
-        Dictionary containing all loaded data
+        Dictionary containing all loaded data. Event streams are sorted by
+        epoch seconds and also available column-oriented under ``columns``;
+        ``complete`` holds the records of each stream in REQUIRED_FIELDS
+        that carry all of its required payload fields.
+        Every stream event and inventory snapshot carries its epoch seconds
+        under ``_ts`` so detectors never reparse timestamps, and a ``data``
+        payload (empty if the record had none) so it can be indexed directly.
     """
     data = {
         'pos_transactions': load_jsonl(data_dir / 'pos_transactions.jsonl'),
@@ -73,10 +158,27 @@ def load_all_data(data_dir: Path) -> Dict[str, Any]:
         'inventory_snapshots': load_jsonl(data_dir / 'inventory_snapshots.jsonl'),
         'products_list': load_csv(data_dir / 'products_list.csv'),
         'customer_data': load_csv(data_dir / 'customer_data.csv'),
+        'columns': {},
+        'complete': {},
     }
     
-    # Sort all event streams by timestamp
-    for key in ['pos_transactions', 'rfid_readings', 'queue_monitoring', 'product_recognition']:
-        data[key].sort(key=lambda x: parse_timestamp(x['timestamp']))
+    # Parse each timestamp once and sort the streams by the resulting epoch;
+    # timestamp strings with differing UTC offsets do not sort chronologically.
+    for key, fields in STREAM_FIELDS.items():
+        for event in data[key]:
+            event['_ts'] = parse_epoch(event['timestamp'])
+            if 'data' not in event:
+                event['data'] = {}
+        data[key].sort(key=itemgetter('_ts'))
+        epochs = [event['_ts'] for event in data[key]]
+        data['columns'][key] = to_columns(data[key], epochs, fields)
+    
+    for key, required in REQUIRED_FIELDS.items():
+        data['complete'][key] = [event for event in data[key] if required <= event['data'].keys()]
+    
+    for snapshot in data['inventory_snapshots']:
+        snapshot['_ts'] = parse_epoch(snapshot['timestamp'])
+        if 'data' not in snapshot:
+            snapshot['data'] = {}
     
     return data
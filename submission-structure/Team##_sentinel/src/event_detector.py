@@ -1,65 +1,155 @@
 #!/usr/bin/env python3
-"""Event detection algorithms for Project Sentinel."""
+"""Event detection algorithms for Project Sentinel.
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
+Detectors expect events as produced by ``data_loader.load_all_data``, which
+stores each event's epoch seconds under ``_ts`` and always sets its ``data``
+payload. Detectors correlating SKUs take the ``complete`` records, which are
+guaranteed to carry the payload fields they read. Station-correlated
+detectors take the indexes returned by ``build_station_index`` so the
+grouping and sorting is done once per stream rather than once per detector.
+The loader sorts every stream by ``_ts``, and every detector returns its
+events sorted by ``Event.ts`` (the ``_ts`` of the record that raised them),
+so callers can merge the outputs without re-sorting.
+"""
+
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from itertools import compress, repeat
+from math import inf
+from operator import attrgetter, ge, gt, itemgetter, sub
+
+
+class Event(NamedTuple):
+    """A detected event; ``event_record`` turns it into its output shape."""
+    ts: float
+    timestamp: str
+    name: str
+    values: Tuple[Any, ...]
+
+
+# Output field names for each event name, in the order of ``Event.values``
+EVENT_FIELDS = {
+    'Scanner Avoidance': ('station_id', 'customer_id', 'product_sku'),
+    'Barcode Switching': ('station_id', 'customer_id', 'actual_sku', 'scanned_sku'),
+    'Weight Discrepancies': (
+        'station_id', 'customer_id', 'product_sku', 'expected_weight', 'actual_weight'
+    ),
+    'Long Queue Length': ('station_id', 'num_of_customers'),
+    'Long Wait Time': ('station_id', 'wait_time_seconds'),
+    'Unexpected Systems Crash': ('station_id', 'duration_seconds'),
+    'Inventory Discrepancy': ('SKU', 'Expected_Inventory', 'Actual_Inventory'),
+    'Succes Operation': ('station_id', 'customer_id', 'product_sku'),
+}
+
+# Station id -> (sorted epoch seconds, events in the same order)
+StationIndex = Dict[str, Tuple[List[float], List[Dict[str, Any]]]]
+
+
+def event_record(event: Event, event_id: str) -> Dict[str, Any]:
+    """Build the output JSON object for a detected event.
+    
+    Args:
+        event: Detected event
+        event_id: Identifier assigned once the final event order is known
+        
+    Returns:
+        Dictionary with ``timestamp``, ``event_id`` and ``event_data``
+    """
+    event_data = {'event_name': event.name}
+    event_data.update(zip(EVENT_FIELDS[event.name], event.values))
+    return {'timestamp': event.timestamp, 'event_id': event_id, 'event_data': event_data}
+
+
+def build_station_index(events: List[Dict[str, Any]]) -> StationIndex:
+    """Group events by station and sort each group by time.
+    
+    Args:
+        events: Events carrying ``station_id`` and ``_ts``
+        
+    Returns:
+        Per-station sorted timestamps with the matching events
+    """
+    events_by_station = defaultdict(list)
+    for event in events:
+        station_id = event.get('station_id')
+        if station_id:
+            events_by_station[station_id].append(event)
+    
+    index = {}
+    for station_id, station_events in events_by_station.items():
+        station_events.sort(key=itemgetter('_ts'))
+        index[station_id] = ([event['_ts'] for event in station_events], station_events)
+    return index
+
+
+def build_product_weights(products_list: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Map each catalog SKU to its expected weight in grams.
+    
+    Args:
+        products_list: Product catalog rows
+        
+    Returns:
+        Expected weight per SKU, skipping rows without a usable weight
+    """
+    product_weights = {}
+    for product in products_list:
+        sku = product.get('SKU')
+        weight = product.get('Weight (g)')
+        if sku and weight:
+            try:
+                product_weights[sku] = float(weight)
+            except (ValueError, TypeError):
+                pass
+    return product_weights
 
 
 # @algorithm Scanner Avoidance Detection | Detects when customers avoid scanning products by comparing RFID and POS data
 def detect_scanner_avoidance(
     pos_transactions: List[Dict[str, Any]],
-    rfid_readings: List[Dict[str, Any]],
+    rfid_index: StationIndex,
     time_window_seconds: int = 10
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect scanner avoidance by comparing RFID readings with POS transactions.
     
     Args:
-        pos_transactions: List of POS transaction events
-        rfid_readings: List of RFID reading events
+        pos_transactions: Complete POS transaction events
+        rfid_index: Complete RFID readings indexed by station
         time_window_seconds: Time window to correlate events
         
     Returns:
         List of scanner avoidance events
     """
     events = []
-    event_counter = 0
     
-    # Group RFID readings by customer/station/time
-    rfid_by_station = defaultdict(list)
-    for rfid in rfid_readings:
-        if rfid.get('data', {}).get('location') == 'IN_SCAN_AREA':
-            rfid_by_station[rfid['station_id']].append(rfid)
+    # Flatten the scan-area readings to per-station time and SKU id columns
+    sku_ids = {}
+    scan_area_skus = _station_columns(
+        rfid_index, 'sku', sku_ids, lambda data: data.get('location') == 'IN_SCAN_AREA'
+    )
+    sku_names = list(sku_ids)
     
     # Check each POS transaction
     for pos in pos_transactions:
         station_id = pos['station_id']
-        customer_id = pos.get('data', {}).get('customer_id')
-        pos_sku = pos.get('data', {}).get('sku')
-        pos_time = datetime.fromisoformat(pos['timestamp'])
+        customer_id = pos['data'].get('customer_id')
+        pos_sku = pos['data']['sku']
         
-        # Find RFID readings in the same time window
+        # Find RFID readings in the scan area in the same time window
         rfid_skus = set()
-        for rfid in rfid_by_station.get(station_id, []):
-            rfid_time = datetime.fromisoformat(rfid['timestamp'])
-            time_diff = abs((rfid_time - pos_time).total_seconds())
-            if time_diff <= time_window_seconds:
-                rfid_skus.add(rfid.get('data', {}).get('sku'))
+        if station_id in scan_area_skus:
+            rfid_times, rfid_skus_list = scan_area_skus[station_id]
+            lo, hi = _window_bounds(rfid_times, pos['_ts'], time_window_seconds)
+            rfid_skus = set(rfid_skus_list[lo:hi])
         
         # Check for SKUs detected by RFID but not scanned
-        unscanned_skus = rfid_skus - {pos_sku}
-        for unscanned_sku in unscanned_skus:
-            events.append({
-                'timestamp': pos['timestamp'],
-                'event_id': f'E{event_counter:03d}',
-                'event_data': {
-                    'event_name': 'Scanner Avoidance',
-                    'station_id': station_id,
-                    'customer_id': customer_id,
-                    'product_sku': unscanned_sku
-                }
-            })
-            event_counter += 1
+        unscanned_skus = rfid_skus - {sku_ids.get(pos_sku, -1)}
+        for unscanned_sku_id in unscanned_skus:
+            unscanned_sku = sku_names[unscanned_sku_id]
+            events.append(Event(
+                pos['_ts'], pos['timestamp'],
+                'Scanner Avoidance', (station_id, customer_id, unscanned_sku)
+            ))
     
     return events
 
@@ -67,127 +157,161 @@ def detect_scanner_avoidance(
 # @algorithm Barcode Switching Detection | Detects when a different barcode is scanned than the product present
 def detect_barcode_switching(
     pos_transactions: List[Dict[str, Any]],
-    product_recognition: List[Dict[str, Any]],
+    recognition_index: StationIndex,
     time_window_seconds: int = 5
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect barcode switching by comparing visual recognition with scanned barcodes.
     
     Args:
-        pos_transactions: List of POS transaction events
-        product_recognition: List of product recognition events
+        pos_transactions: Complete POS transaction events
+        recognition_index: Complete product recognition events indexed by station
         time_window_seconds: Time window to correlate events
         
     Returns:
         List of barcode switching events
     """
     events = []
-    event_counter = 0
     
-    # Group product recognition by station
-    recognition_by_station = defaultdict(list)
-    for recog in product_recognition:
-        if recog.get('data', {}).get('accuracy', 0) > 0.5:  # Only use confident predictions
-            recognition_by_station[recog['station_id']].append(recog)
+    # Flatten confident predictions to per-station time and SKU id columns
+    sku_ids = {}
+    predictions = _station_columns(
+        recognition_index, 'predicted_product', sku_ids,
+        lambda data: data['accuracy'] > 0.5 and bool(data['predicted_product'])
+    )
+    sku_names = list(sku_ids)
+    
+    # Index where each prediction run ends, so the first mismatch is found without a scan
+    run_ends = {
+        station_id: _run_ends(predicted_ids) for station_id, (_, predicted_ids) in predictions.items()
+    }
     
     # Check each POS transaction
     for pos in pos_transactions:
         station_id = pos['station_id']
-        customer_id = pos.get('data', {}).get('customer_id')
-        scanned_sku = pos.get('data', {}).get('sku')
-        pos_time = datetime.fromisoformat(pos['timestamp'])
+        if station_id not in predictions:
+            continue
+        customer_id = pos['data'].get('customer_id')
+        scanned_sku = pos['data']['sku']
         
         # Find product recognition in the same time window
-        for recog in recognition_by_station.get(station_id, []):
-            recog_time = datetime.fromisoformat(recog['timestamp'])
-            time_diff = abs((recog_time - pos_time).total_seconds())
-            
-            if time_diff <= time_window_seconds:
-                predicted_sku = recog.get('data', {}).get('predicted_product')
-                
-                # If predicted SKU differs from scanned SKU, it's potential barcode switching
-                if predicted_sku and predicted_sku != scanned_sku:
-                    events.append({
-                        'timestamp': pos['timestamp'],
-                        'event_id': f'E{event_counter:03d}',
-                        'event_data': {
-                            'event_name': 'Barcode Switching',
-                            'station_id': station_id,
-                            'customer_id': customer_id,
-                            'actual_sku': predicted_sku,
-                            'scanned_sku': scanned_sku
-                        }
-                    })
-                    event_counter += 1
-                    break
+        recognition_times, predicted_ids = predictions[station_id]
+        lo, hi = _window_bounds(recognition_times, pos['_ts'], time_window_seconds)
+        
+        if lo >= hi:
+            continue
+        
+        # If predicted SKU differs from scanned SKU, it's potential barcode switching
+        first = lo if predicted_ids[lo] != sku_ids.get(scanned_sku, -1) else run_ends[station_id][lo]
+        if first < hi:
+            predicted_sku = sku_names[predicted_ids[first]]
+            events.append(Event(
+                pos['_ts'], pos['timestamp'],
+                'Barcode Switching', (station_id, customer_id, predicted_sku, scanned_sku)
+            ))
     
     return events
 
 
 # @algorithm Weight Discrepancy Detection | Detects when scanned product weight differs from expected weight
 def detect_weight_discrepancies(
-    pos_transactions: List[Dict[str, Any]],
+    pos_columns: Dict[str, List[Any]],
     products_list: List[Dict[str, Any]],
     tolerance_percent: float = 20.0
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect weight discrepancies by comparing actual weights with expected weights.
     
+    Callers checking several batches against the same catalog should keep the
+    detector returned by ``make_weight_detector`` instead.
+    
     Args:
-        pos_transactions: List of POS transaction events
+        pos_columns: Column-oriented POS transactions
         products_list: Product catalog with expected weights
         tolerance_percent: Acceptable weight variance percentage
         
     Returns:
         List of weight discrepancy events
     """
-    events = []
-    event_counter = 0
+    return make_weight_detector(products_list, tolerance_percent)(pos_columns)
+
+
+def make_weight_detector(
+    products_list: List[Dict[str, Any]],
+    tolerance_percent: float = 20.0
+) -> Callable[[Dict[str, List[Any]]], List[Event]]:
+    """Specialize weight discrepancy detection for a product catalog.
     
-    # Create product weight lookup
-    product_weights = {}
-    for product in products_list:
-        sku = product.get('SKU')
-        weight = product.get('Weight (g)')
-        if sku and weight:
-            try:
-                product_weights[sku] = float(weight)
-            except (ValueError, TypeError):
-                pass
+    Args:
+        products_list: Product catalog with expected weights
+        tolerance_percent: Acceptable weight variance percentage
+        
+    Returns:
+        Function taking column-oriented POS transactions and returning
+        weight discrepancy events
+    """
+    product_weights = build_product_weights(products_list)
+    tolerance = tolerance_percent / 100.0
     
-    # Check each POS transaction
-    for pos in pos_transactions:
-        sku = pos.get('data', {}).get('sku')
-        actual_weight = pos.get('data', {}).get('weight_g')
-        customer_id = pos.get('data', {}).get('customer_id')
-        station_id = pos['station_id']
+    # Index expected weight and allowed difference by a dense SKU id. A trailing
+    # sentinel picks up SKU id -1 so uncatalogued rows never match.
+    sku_ids = {sku: idx for idx, sku in enumerate(product_weights)}
+    expected_weights = list(product_weights.values()) + [0.0]
+    allowed_diffs = [weight * tolerance for weight in product_weights.values()] + [inf]
+    
+    def detect(pos_columns: Dict[str, List[Any]]) -> List[Event]:
+        events = []
         
-        if sku in product_weights and actual_weight:
-            expected_weight = product_weights[sku]
-            weight_diff = abs(actual_weight - expected_weight)
-            tolerance = expected_weight * (tolerance_percent / 100.0)
-            
-            if weight_diff > tolerance:
-                events.append({
-                    'timestamp': pos['timestamp'],
-                    'event_id': f'E{event_counter:03d}',
-                    'event_data': {
-                        'event_name': 'Weight Discrepancies',
-                        'station_id': station_id,
-                        'customer_id': customer_id,
-                        'product_sku': sku,
-                        'expected_weight': int(expected_weight),
-                        'actual_weight': int(actual_weight)
-                    }
-                })
-                event_counter += 1
+        # Scan the POS columns in one batch
+        pos_skus = pos_columns['sku']
+        pos_weights = pos_columns['weight_g']
+        pos_sku_ids = [sku_ids.get(sku, -1) for sku in pos_skus]
+        
+        for idx in _scan_weight_outliers(pos_sku_ids, pos_weights, expected_weights, allowed_diffs):
+            events.append(Event(
+                pos_columns['epoch'][idx], pos_columns['timestamp'][idx],
+                'Weight Discrepancies', (
+                    pos_columns['station_id'][idx],
+                    pos_columns['customer_id'][idx],
+                    pos_skus[idx],
+                    int(expected_weights[pos_sku_ids[idx]]),
+                    int(pos_weights[idx])
+                )
+            ))
+        
+        return events
     
-    return events
+    return detect
+
+
+def _scan_weight_outliers(
+    sku_ids: List[int],
+    weights: List[Optional[float]],
+    expected_weights: List[float],
+    allowed_diffs: List[float]
+) -> List[int]:
+    """Find rows whose weight is outside the tolerance of the catalog weight.
+    
+    Args:
+        sku_ids: SKU id per row, -1 for the sentinel entry of uncatalogued SKUs
+        weights: Measured weight per row
+        expected_weights: Catalog weight indexed by SKU id
+        allowed_diffs: Largest acceptable difference indexed by SKU id
+        
+    Returns:
+        Indices of the rows with a weight discrepancy
+    """
+    # Elementwise passes through map/compress keep the per-row work in C
+    rows = list(compress(range(len(weights)), weights))
+    row_ids = list(map(sku_ids.__getitem__, rows))
+    row_weights = map(weights.__getitem__, rows)
+    diffs = map(abs, map(sub, row_weights, map(expected_weights.__getitem__, row_ids)))
+    return list(compress(rows, map(gt, diffs, map(allowed_diffs.__getitem__, row_ids))))
 
 
 # @algorithm Long Queue Detection | Detects when queue length exceeds threshold
 def detect_long_queues(
     queue_monitoring: List[Dict[str, Any]],
     threshold: int = 5
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect long queues when customer count exceeds threshold.
     
     Args:
@@ -198,23 +322,16 @@ def detect_long_queues(
         List of long queue events
     """
     events = []
-    event_counter = 0
     
     for queue in queue_monitoring:
-        customer_count = queue.get('data', {}).get('customer_count', 0)
+        customer_count = queue['data'].get('customer_count', 0)
         station_id = queue['station_id']
         
         if customer_count > threshold:
-            events.append({
-                'timestamp': queue['timestamp'],
-                'event_id': f'E{event_counter:03d}',
-                'event_data': {
-                    'event_name': 'Long Queue Length',
-                    'station_id': station_id,
-                    'num_of_customers': customer_count
-                }
-            })
-            event_counter += 1
+            events.append(Event(
+                queue['_ts'], queue['timestamp'],
+                'Long Queue Length', (station_id, customer_count)
+            ))
     
     return events
 
@@ -223,7 +340,7 @@ def detect_long_queues(
 def detect_long_wait_times(
     queue_monitoring: List[Dict[str, Any]],
     threshold_seconds: float = 300.0
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect long wait times when dwell time exceeds threshold.
     
     Args:
@@ -234,72 +351,60 @@ def detect_long_wait_times(
         List of long wait time events
     """
     events = []
-    event_counter = 0
     
     for queue in queue_monitoring:
-        avg_dwell_time = queue.get('data', {}).get('average_dwell_time', 0)
+        avg_dwell_time = queue['data'].get('average_dwell_time', 0)
         station_id = queue['station_id']
         
         if avg_dwell_time > threshold_seconds:
-            events.append({
-                'timestamp': queue['timestamp'],
-                'event_id': f'E{event_counter:03d}',
-                'event_data': {
-                    'event_name': 'Long Wait Time',
-                    'station_id': station_id,
-                    'wait_time_seconds': int(avg_dwell_time)
-                }
-            })
-            event_counter += 1
+            events.append(Event(
+                queue['_ts'], queue['timestamp'],
+                'Long Wait Time', (station_id, int(avg_dwell_time))
+            ))
     
     return events
 
 
 # @algorithm System Crash Detection | Detects system crashes based on status changes
 def detect_system_crashes(
-    all_events: List[Dict[str, Any]],
+    station_indexes: List[StationIndex],
     gap_threshold_seconds: int = 120
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect system crashes by identifying large gaps in event streams.
     
     Args:
-        all_events: All events sorted by timestamp
+        station_indexes: Per-stream station indexes to combine
         gap_threshold_seconds: Minimum gap to consider as a crash
         
     Returns:
         List of system crash events
     """
     events = []
-    event_counter = 0
     
-    # Group events by station
+    # Combine every stream's timestamps and events per station
+    station_times = defaultdict(list)
     station_events = defaultdict(list)
-    for event in all_events:
-        station_id = event.get('station_id')
-        if station_id:
-            station_events[station_id].append(event)
+    for index in station_indexes:
+        for station_id, (indexed_times, indexed_events) in index.items():
+            station_times[station_id].extend(indexed_times)
+            station_events[station_id].extend(indexed_events)
     
     # Check for large gaps in each station
-    for station_id, station_event_list in station_events.items():
-        station_event_list.sort(key=lambda x: datetime.fromisoformat(x['timestamp']))
+    for station_id, times in station_times.items():
+        order = sorted(range(len(times)), key=times.__getitem__)
+        sorted_times = list(map(times.__getitem__, order))
+        gaps = map(sub, sorted_times[1:], sorted_times)
         
-        for i in range(len(station_event_list) - 1):
-            current_time = datetime.fromisoformat(station_event_list[i]['timestamp'])
-            next_time = datetime.fromisoformat(station_event_list[i + 1]['timestamp'])
-            gap = (next_time - current_time).total_seconds()
-            
-            if gap >= gap_threshold_seconds:
-                events.append({
-                    'timestamp': station_event_list[i + 1]['timestamp'],
-                    'event_id': f'E{event_counter:03d}',
-                    'event_data': {
-                        'event_name': 'Unexpected Systems Crash',
-                        'station_id': station_id,
-                        'duration_seconds': int(gap)
-                    }
-                })
-                event_counter += 1
-    
+        # Only rows that end a gap become events
+        for i in compress(range(1, len(sorted_times)), map(ge, gaps, repeat(gap_threshold_seconds))):
+            gap = sorted_times[i] - sorted_times[i - 1]
+            events.append(Event(
+                sorted_times[i], station_events[station_id][order[i]]['timestamp'],
+                'Unexpected Systems Crash', (station_id, int(gap))
+            ))
+    
+    # Gaps were found station by station; put them in time order
+    events.sort(key=attrgetter('ts'))
     return events
 
 
@@ -308,37 +413,30 @@ def detect_inventory_discrepancies(
     inventory_snapshots: List[Dict[str, Any]],
     pos_transactions: List[Dict[str, Any]],
     threshold_percent: float = 10.0
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect inventory discrepancies by comparing snapshots with transaction history.
     
     Args:
         inventory_snapshots: Inventory snapshot events
-        pos_transactions: POS transaction events
+        pos_transactions: Complete POS transaction events
         threshold_percent: Acceptable variance percentage
         
     Returns:
         List of inventory discrepancy events
     """
     events = []
-    event_counter = 0
     
     if not inventory_snapshots:
         return events
     
     # Get initial inventory snapshot
     initial_snapshot = inventory_snapshots[0]
-    inventory_data = initial_snapshot.get('data', {})
-    snapshot_time = datetime.fromisoformat(initial_snapshot['timestamp'])
+    inventory_data = initial_snapshot['data']
+    snapshot_time = initial_snapshot['_ts']
     
     # Calculate expected inventory based on transactions
-    expected_inventory = dict(inventory_data)
-    
-    for pos in pos_transactions:
-        pos_time = datetime.fromisoformat(pos['timestamp'])
-        if pos_time > snapshot_time:
-            sku = pos.get('data', {}).get('sku')
-            if sku in expected_inventory:
-                expected_inventory[sku] -= 1
+    sold = Counter(pos['data']['sku'] for pos in pos_transactions if pos['_ts'] > snapshot_time)
+    expected_inventory = {sku: qty - sold[sku] for sku, qty in inventory_data.items()}
     
     # Compare with later snapshots or final expected inventory
     for sku, expected_qty in expected_inventory.items():
@@ -347,17 +445,10 @@ def detect_inventory_discrepancies(
             variance_percent = abs(expected_qty - actual_qty) / actual_qty * 100
             
             if variance_percent > threshold_percent and abs(expected_qty - actual_qty) > 5:
-                events.append({
-                    'timestamp': initial_snapshot['timestamp'],
-                    'event_id': f'E{event_counter:03d}',
-                    'event_data': {
-                        'event_name': 'Inventory Discrepancy',
-                        'SKU': sku,
-                        'Expected_Inventory': int(inventory_data[sku]),
-                        'Actual_Inventory': int(expected_qty)
-                    }
-                })
-                event_counter += 1
+                events.append(Event(
+                    snapshot_time, initial_snapshot['timestamp'],
+                    'Inventory Discrepancy', (sku, int(expected_qty), int(actual_qty))
+                ))
     
     return events
 
@@ -365,56 +456,105 @@ def detect_inventory_discrepancies(
 # @algorithm Success Operation Detection | Detects successful checkout operations
 def detect_success_operations(
     pos_transactions: List[Dict[str, Any]],
-    rfid_readings: List[Dict[str, Any]],
+    rfid_index: StationIndex,
     time_window_seconds: int = 10
-) -> List[Dict[str, Any]]:
+) -> List[Event]:
     """Detect successful operations where POS and RFID data match.
     
     Args:
-        pos_transactions: List of POS transaction events
-        rfid_readings: List of RFID reading events
+        pos_transactions: Complete POS transaction events
+        rfid_index: Complete RFID readings indexed by station
         time_window_seconds: Time window to correlate events
         
     Returns:
         List of success operation events
     """
     events = []
-    event_counter = 0
     
-    # Group RFID readings by station
-    rfid_by_station = defaultdict(list)
-    for rfid in rfid_readings:
-        rfid_by_station[rfid['station_id']].append(rfid)
+    # Split each station's RFID read times by SKU id; station order keeps them sorted
+    sku_ids = {}
+    read_times = defaultdict(list)
+    rfid_skus = _station_columns(rfid_index, 'sku', sku_ids)
+    for station_id, (rfid_times, rfid_sku_ids) in rfid_skus.items():
+        for ts, sku_id in zip(rfid_times, rfid_sku_ids):
+            read_times[(station_id, sku_id)].append(ts)
     
     # Check each POS transaction
     for pos in pos_transactions:
         station_id = pos['station_id']
-        customer_id = pos.get('data', {}).get('customer_id')
-        pos_sku = pos.get('data', {}).get('sku')
-        pos_time = datetime.fromisoformat(pos['timestamp'])
+        customer_id = pos['data'].get('customer_id')
+        pos_sku = pos['data']['sku']
         
-        # Find matching RFID reading
-        rfid_match = False
-        for rfid in rfid_by_station.get(station_id, []):
-            rfid_time = datetime.fromisoformat(rfid['timestamp'])
-            rfid_sku = rfid.get('data', {}).get('sku')
-            time_diff = abs((rfid_time - pos_time).total_seconds())
-            
-            if time_diff <= time_window_seconds and rfid_sku == pos_sku:
-                rfid_match = True
-                break
+        # Find matching RFID reading: one bisect into this SKU's reads at the station
+        times = read_times.get((station_id, sku_ids.get(pos_sku, -1)))
+        if not times:
+            continue
+        first = bisect_left(times, pos['_ts'] - time_window_seconds)
+        rfid_match = first < len(times) and times[first] <= pos['_ts'] + time_window_seconds
         
         if rfid_match:
-            events.append({
-                'timestamp': pos['timestamp'],
-                'event_id': f'E{event_counter:03d}',
-                'event_data': {
-                    'event_name': 'Succes Operation',
-                    'station_id': station_id,
-                    'customer_id': customer_id,
-                    'product_sku': pos_sku
-                }
-            })
-            event_counter += 1
+            events.append(Event(
+                pos['_ts'], pos['timestamp'],
+                'Succes Operation', (station_id, customer_id, pos_sku)
+            ))
     
     return events
+
+
+def _station_columns(
+    index: StationIndex,
+    field: str,
+    ids: Dict[Any, int],
+    keep: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Dict[str, Tuple[List[float], List[int]]]:
+    """Flatten a station index into parallel time and interned value columns.
+    
+    Args:
+        index: Events indexed by station
+        field: Key to extract from each event's ``data``
+        ids: Intern table mapping each value to a dense int id, extended in place
+        keep: Optional filter on an event's ``data``
+        
+    Returns:
+        Per-station sorted timestamps with the matching value ids
+    """
+    columns = {}
+    for station_id, (times, station_events) in index.items():
+        kept_times = []
+        values = []
+        for ts, event in zip(times, station_events):
+            data = event['data']
+            if keep is None or keep(data):
+                kept_times.append(ts)
+                values.append(ids.setdefault(data[field], len(ids)))
+        columns[station_id] = (kept_times, values)
+    return columns
+
+
+def _run_ends(values: List[int]) -> List[int]:
+    """Find, for each position, where its run of equal values ends.
+    
+    Args:
+        values: Sequence of value ids
+        
+    Returns:
+        Index of the next differing value after each position, or ``len(values)``
+    """
+    ends = [len(values)] * len(values)
+    for i in range(len(values) - 2, -1, -1):
+        ends[i] = i + 1 if values[i + 1] != values[i] else ends[i + 1]
+    return ends
+
+
+def _window_bounds(times: List[float], center: float, radius: float) -> Tuple[int, int]:
+    """Find the slice of sorted ``times`` lying within ``radius`` of ``center``.
+    
+    Args:
+        times: Sorted epoch seconds
+        center: Epoch seconds at the middle of the window
+        radius: Half-width of the window in seconds
+        
+    Returns:
+        ``(lo, hi)`` slice bounds into ``times``
+    """
+    return bisect_left(times, center - radius), bisect_right(times, center + radius)
@@ -1,16 +1,28 @@
 #!/usr/bin/env python3
 """Main processing pipeline for Project Sentinel event detection."""
 
+import heapq
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
 
-from data_loader import load_all_data
+try:
+    from orjson import dumps as json_dumps
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+from data_loader import STREAM_FIELDS, load_all_data
 from event_detector import (
+    Event,
+    event_record,
+    build_station_index,
     detect_scanner_avoidance,
     detect_barcode_switching,
-    detect_weight_discrepancies,
+    make_weight_detector,
     detect_long_queues,
     detect_long_wait_times,
     detect_system_crashes,
@@ -19,6 +31,103 @@ from event_detector import (
 )
 
 
+def _apply_detector(detector: Callable[..., List[Event]], *args: Any) -> List[Event]:
+    """Run a detector that was specialized ahead of time and passed in as an input."""
+    return detector(*args)
+
+
+# Detectors run by the pipeline, with the shared inputs each one takes
+DETECTOR_TASKS = [
+    ('scanner avoidance', detect_scanner_avoidance, ('pos_transactions', 'rfid_index')),
+    ('barcode switching', detect_barcode_switching, ('pos_transactions', 'recognition_index')),
+    ('weight discrepancies', _apply_detector, ('weight_detector', 'pos_columns')),
+    ('long queues', detect_long_queues, ('queue_monitoring',)),
+    ('long wait times', detect_long_wait_times, ('queue_monitoring',)),
+    ('system crashes', detect_system_crashes, ('station_indexes',)),
+    ('inventory discrepancies', detect_inventory_discrepancies, ('inventory_snapshots', 'pos_transactions')),
+    ('success operations', detect_success_operations, ('pos_transactions', 'rfid_index')),
+]
+
+# Below this many stream events, starting worker processes costs more than it saves
+PARALLEL_MIN_EVENTS = 200_000
+
+# Output file buffer size, and how many events are serialized per write
+OUTPUT_BUFFER_SIZE = 1 << 20
+WRITE_CHUNK_EVENTS = 4096
+
+# Inputs built from the others by specialize_inputs; closures do not pickle, so
+# worker processes rebuild them instead of receiving them
+PROCESS_LOCAL_INPUTS = ('weight_detector',)
+
+# Detector inputs, set in each worker process by _init_worker
+_shared_inputs: Dict[str, Any] = {}
+
+
+def specialize_inputs(shared_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the detectors specialized for this run's product catalog.
+    
+    Args:
+        shared_inputs: Inputs referenced by DETECTOR_TASKS, without PROCESS_LOCAL_INPUTS
+        
+    Returns:
+        The inputs plus every entry of PROCESS_LOCAL_INPUTS
+    """
+    return {**shared_inputs, 'weight_detector': make_weight_detector(shared_inputs['products_list'])}
+
+
+def _init_worker(shared_inputs: Dict[str, Any]) -> None:
+    """Keep the shared detector inputs in a worker process."""
+    global _shared_inputs
+    _shared_inputs = specialize_inputs(shared_inputs)
+
+
+def _run_detector(task_idx: int, shared_inputs: Optional[Dict[str, Any]] = None) -> List[Event]:
+    """Run one entry of DETECTOR_TASKS against the shared inputs.
+    
+    Args:
+        task_idx: Index into DETECTOR_TASKS
+        shared_inputs: Detector inputs; defaults to the worker's copy
+        
+    Returns:
+        Events detected by that detector
+    """
+    _, detector, input_keys = DETECTOR_TASKS[task_idx]
+    inputs = _shared_inputs if shared_inputs is None else shared_inputs
+    return detector(*(inputs[key] for key in input_keys))
+
+
+def run_detectors(shared_inputs: Dict[str, Any], parallel: bool) -> List[List[Event]]:
+    """Run every detector and collect their events in DETECTOR_TASKS order.
+    
+    Args:
+        shared_inputs: Inputs referenced by DETECTOR_TASKS
+        parallel: Fan the detectors out across worker processes
+        
+    Returns:
+        Each detector's events, in time order
+    """
+    detector_outputs = []
+    
+    if not parallel:
+        for task_idx, (label, _, _) in enumerate(DETECTOR_TASKS):
+            print(f"  - Detecting {label}...")
+            detector_outputs.append(_run_detector(task_idx, shared_inputs))
+        return detector_outputs
+    
+    portable_inputs = {
+        key: value for key, value in shared_inputs.items() if key not in PROCESS_LOCAL_INPUTS
+    }
+    workers = min(len(DETECTOR_TASKS), os.cpu_count() or 1)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(portable_inputs,)) as ex:
+        futures = []
+        for task_idx, (label, _, _) in enumerate(DETECTOR_TASKS):
+            print(f"  - Detecting {label}...")
+            futures.append(ex.submit(_run_detector, task_idx))
+        for future in futures:
+            detector_outputs.append(future.result())
+    return detector_outputs
+
+
 def process_events(data_dir: Path, output_file: Path) -> None:
     """Process all events and generate output file.
     
@@ -29,72 +138,57 @@ def process_events(data_dir: Path, output_file: Path) -> None:
     print(f"Loading data from {data_dir}...")
     data = load_all_data(data_dir)
     
+    # Group each stream by station once and share the indexes across detectors
+    pos_index = build_station_index(data['pos_transactions'])
+    rfid_index = build_station_index(data['rfid_readings'])
+    queue_index = build_station_index(data['queue_monitoring'])
+    recognition_index = build_station_index(data['product_recognition'])
+    
+    # SKU correlation only sees complete records; crash detection sees every record
+    complete = data['complete']
+    if len(complete['rfid_readings']) < len(data['rfid_readings']):
+        complete_rfid_index = build_station_index(complete['rfid_readings'])
+    else:
+        complete_rfid_index = rfid_index
+    if len(complete['product_recognition']) < len(data['product_recognition']):
+        complete_recognition_index = build_station_index(complete['product_recognition'])
+    else:
+        complete_recognition_index = recognition_index
+    
+    shared_inputs = specialize_inputs({
+        'pos_transactions': complete['pos_transactions'],
+        'pos_columns': data['columns']['pos_transactions'],
+        'queue_monitoring': data['queue_monitoring'],
+        'inventory_snapshots': data['inventory_snapshots'],
+        'rfid_index': complete_rfid_index,
+        'recognition_index': complete_recognition_index,
+        'station_indexes': [pos_index, rfid_index, queue_index, recognition_index],
+        'products_list': data['products_list'],
+    })
+    
     print("Detecting events...")
-    all_detected_events = []
-    
-    # Detect various event types
-    print("  - Detecting scanner avoidance...")
-    all_detected_events.extend(
-        detect_scanner_avoidance(data['pos_transactions'], data['rfid_readings'])
-    )
-    
-    print("  - Detecting barcode switching...")
-    all_detected_events.extend(
-        detect_barcode_switching(data['pos_transactions'], data['product_recognition'])
-    )
-    
-    print("  - Detecting weight discrepancies...")
-    all_detected_events.extend(
-        detect_weight_discrepancies(data['pos_transactions'], data['products_list'])
-    )
-    
-    print("  - Detecting long queues...")
-    all_detected_events.extend(
-        detect_long_queues(data['queue_monitoring'])
-    )
-    
-    print("  - Detecting long wait times...")
-    all_detected_events.extend(
-        detect_long_wait_times(data['queue_monitoring'])
-    )
-    
-    # Combine all events for crash detection
-    all_events = (
-        data['pos_transactions'] + 
-        data['rfid_readings'] + 
-        data['queue_monitoring'] + 
-        data['product_recognition']
-    )
-    
-    print("  - Detecting system crashes...")
-    all_detected_events.extend(
-        detect_system_crashes(all_events)
-    )
-    
-    print("  - Detecting inventory discrepancies...")
-    all_detected_events.extend(
-        detect_inventory_discrepancies(data['inventory_snapshots'], data['pos_transactions'])
-    )
-    
-    print("  - Detecting success operations...")
-    all_detected_events.extend(
-        detect_success_operations(data['pos_transactions'], data['rfid_readings'])
-    )
-    
-    # Sort events by timestamp
-    all_detected_events.sort(key=lambda x: datetime.fromisoformat(x['timestamp']))
-    
-    # Reassign event IDs in sequential order
-    for idx, event in enumerate(all_detected_events):
-        event['event_id'] = f'E{idx:03d}'
+    total_events = sum(len(data[key]) for key in STREAM_FIELDS)
+    detector_outputs = run_detectors(shared_inputs, parallel=total_events >= PARALLEL_MIN_EVENTS)
+    
+    # Merge the time-ordered detector outputs; ties keep DETECTOR_TASKS order
+    merged_events = heapq.merge(*detector_outputs, key=attrgetter('ts'))
+    
+    all_detected_events = list(merged_events)
+    
+    # Assign event IDs in output order
+    event_ids = [f'E{idx:03d}' for idx in range(len(all_detected_events))]
     
     # Write output
     print(f"Writing {len(all_detected_events)} events to {output_file}...")
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for event in all_detected_events:
-            f.write(json.dumps(event) + '\n')
+    with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+        for start in range(0, len(all_detected_events), WRITE_CHUNK_EVENTS):
+            end = start + WRITE_CHUNK_EVENTS
+            f.write(b''.join([
+                json_dumps(event_record(event, event_id)) + b'\n'
+                for event, event_id in zip(all_detected_events[start:end], event_ids[start:end])
+            ]))
     
     print(f"Done! Generated {len(all_detected_events)} events.")
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the data loader helpers."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_loader import load_all_data, parse_epoch
+
+
+class ParseEpochTest(unittest.TestCase):
+    """parse_epoch accepts every ISO form fromisoformat does."""
+
+    def test_plain_timestamp(self):
+        self.assertEqual(parse_epoch('2025-08-13T16:00:00'), 1755100800.0)
+
+    def test_fractional_seconds(self):
+        self.assertEqual(parse_epoch('2025-08-13T16:00:00.500000'), 1755100800.5)
+
+    def test_utc_designator(self):
+        self.assertEqual(parse_epoch('2025-08-13T16:00:00Z'), 1755100800.0)
+
+    def test_utc_offset(self):
+        self.assertEqual(parse_epoch('2025-08-13T21:30:00+05:30'), 1755100800.0)
+
+
+
+class LoadOrderTest(unittest.TestCase):
+    """Streams are ordered by instant, not by timestamp string."""
+
+    def test_mixed_offsets_sort_chronologically(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp)
+            stamps = ['2025-08-13T16:10:00+00:00', '2025-08-13T21:30:00+05:30',
+                      '2025-08-13T16:05:00Z']
+            with open(data_dir / 'pos_transactions.jsonl', 'w', encoding='utf-8') as f:
+                for stamp in stamps:
+                    f.write(json.dumps({'timestamp': stamp, 'data': {'sku': 'PRD_1'}}) + '\n')
+            for name in ('rfid_readings', 'queue_monitoring', 'product_recognition',
+                         'inventory_snapshots'):
+                (data_dir / f'{name}.jsonl').write_text('', encoding='utf-8')
+            (data_dir / 'products_list.csv').write_text('SKU\n', encoding='utf-8')
+            (data_dir / 'customer_data.csv').write_text('Customer_ID\n', encoding='utf-8')
+            data = load_all_data(data_dir)
+
+        self.assertEqual([event['timestamp'] for event in data['pos_transactions']],
+                         [stamps[1], stamps[2], stamps[0]])
+        self.assertEqual(data['columns']['pos_transactions']['epoch'],
+                         [1755100800.0, 1755101100.0, 1755101400.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
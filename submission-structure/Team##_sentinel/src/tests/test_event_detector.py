@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Tests for the event detection algorithms."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_loader import load_all_data, to_columns
+from event_detector import (
+    build_station_index,
+    detect_inventory_discrepancies,
+    detect_scanner_avoidance,
+    detect_success_operations,
+    detect_weight_discrepancies,
+    make_weight_detector,
+)
+
+
+def write_dataset(data_dir: Path, streams: dict) -> None:
+    """Write a minimal input directory with the given JSONL streams.
+
+    Args:
+        data_dir: Directory to populate
+        streams: File stem -> list of records; missing streams are left empty
+    """
+    for name in ('pos_transactions', 'rfid_readings', 'queue_monitoring',
+                 'product_recognition', 'inventory_snapshots'):
+        with open(data_dir / f'{name}.jsonl', 'w', encoding='utf-8') as f:
+            for record in streams.get(name, []):
+                f.write(json.dumps(record) + '\n')
+    (data_dir / 'products_list.csv').write_text('SKU,Weight (g)\nPRD_1,100\n', encoding='utf-8')
+    (data_dir / 'customer_data.csv').write_text('Customer_ID\nC001\n', encoding='utf-8')
+
+
+class CustomerlessPosTest(unittest.TestCase):
+    """POS rows without a customer id still take part in SKU correlation."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        data_dir = Path(tmp.name)
+        sales = [
+            {'timestamp': f'2025-08-13T16:00:{second:02d}', 'station_id': 'SCC1',
+             'data': {'sku': 'PRD_1', 'weight_g': 100}}
+            for second in range(10, 16)
+        ]
+        write_dataset(data_dir, {
+            'pos_transactions': sales,
+            'rfid_readings': [
+                {'timestamp': '2025-08-13T16:00:09', 'station_id': 'SCC1', 'data': {'sku': 'PRD_1'}},
+            ],
+            'inventory_snapshots': [
+                {'timestamp': '2025-08-13T16:00:00', 'data': {'PRD_1': 10}},
+            ],
+        })
+        self.data = load_all_data(data_dir)
+
+    def test_row_is_complete(self):
+        self.assertEqual(len(self.data['complete']['pos_transactions']), 6)
+        self.assertEqual(len(self.data['complete']['rfid_readings']), 1)
+
+    def test_sales_decrement_inventory(self):
+        events = detect_inventory_discrepancies(
+            self.data['inventory_snapshots'], self.data['complete']['pos_transactions']
+        )
+        self.assertEqual([event.values for event in events], [('PRD_1', 4, 10)])
+
+    def test_success_operation_without_customer(self):
+        rfid_index = build_station_index(self.data['complete']['rfid_readings'])
+        events = detect_success_operations(self.data['complete']['pos_transactions'], rfid_index)
+        self.assertEqual(len(events), 6)
+        self.assertEqual(events[0].values, ('SCC1', None, 'PRD_1'))
+
+    def test_rfid_without_location_is_not_in_scan_area(self):
+        rfid_index = build_station_index(self.data['complete']['rfid_readings'])
+        events = detect_scanner_avoidance(self.data['complete']['pos_transactions'], rfid_index)
+        self.assertEqual(events, [])
+
+
+class WeightDetectorTest(unittest.TestCase):
+    """A detector from make_weight_detector can be reused across batches."""
+
+    PRODUCTS = [
+        {'SKU': 'PRD_1', 'Weight (g)': '100'},
+        {'SKU': 'PRD_2', 'Weight (g)': '400'},
+        {'SKU': 'PRD_3', 'Weight (g)': 'bad'},
+    ]
+
+    @staticmethod
+    def pos_columns(rows):
+        events = [
+            {'timestamp': f'2025-08-13T16:00:{idx:02d}', 'station_id': 'SCC1',
+             'data': {'customer_id': 'C001', 'sku': sku, 'weight_g': weight}}
+            for idx, (sku, weight) in enumerate(rows)
+        ]
+        return to_columns(events, [float(idx) for idx in range(len(rows))],
+                          ('customer_id', 'sku', 'weight_g'))
+
+    def test_same_results_across_batches(self):
+        first = self.pos_columns([('PRD_1', 100), ('PRD_1', 130), ('PRD_2', 250), ('PRD_9', 1)])
+        second = self.pos_columns([('PRD_3', 5), ('PRD_2', 400), ('PRD_1', 60), ('PRD_2', None)])
+        detect = make_weight_detector(self.PRODUCTS)
+
+        for batch in (first, second, first):
+            self.assertEqual(detect(batch), detect_weight_discrepancies(batch, self.PRODUCTS))
+        self.assertEqual([event.values[2:] for event in detect(first)],
+                         [('PRD_1', 100, 130), ('PRD_2', 400, 250)])
+        self.assertEqual([event.values[2:] for event in detect(second)], [('PRD_1', 100, 60)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the processing pipeline."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_loader import parse_epoch
+from main import process_events
+from test_event_detector import write_dataset
+
+
+class MixedOffsetOrderTest(unittest.TestCase):
+    """Output order and event ids follow the instant, not the timestamp string."""
+
+    def test_events_written_in_time_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp)
+            write_dataset(data_dir, {
+                'pos_transactions': [
+                    {'timestamp': '2025-08-13T21:30:00+05:30', 'station_id': 'SCC1',
+                     'data': {'customer_id': 'C001', 'sku': 'PRD_1', 'weight_g': 200}},
+                    {'timestamp': '2025-08-13T16:10:00+00:00', 'station_id': 'SCC1',
+                     'data': {'customer_id': 'C001', 'sku': 'PRD_1', 'weight_g': 200}},
+                ],
+                'queue_monitoring': [
+                    {'timestamp': '2025-08-13T16:05:00+00:00', 'station_id': 'SCC1',
+                     'data': {'customer_count': 9, 'average_dwell_time': 10}},
+                ],
+            })
+            output_file = data_dir / 'events.jsonl'
+            process_events(data_dir, output_file)
+            with open(output_file, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+
+        weight_and_queue = [
+            (record['event_id'], record['timestamp'], record['event_data']['event_name'])
+            for record in records
+            if record['event_data']['event_name'] in ('Weight Discrepancies', 'Long Queue Length')
+        ]
+        self.assertEqual(weight_and_queue[0][1:], ('2025-08-13T21:30:00+05:30', 'Weight Discrepancies'))
+        self.assertEqual([entry[1:] for entry in weight_and_queue[1:]], [
+            ('2025-08-13T16:05:00+00:00', 'Long Queue Length'),
+            ('2025-08-13T16:10:00+00:00', 'Weight Discrepancies'),
+        ])
+        self.assertEqual([record['event_id'] for record in records],
+                         [f'E{idx:03d}' for idx in range(len(records))])
+        self.assertEqual([record['timestamp'] for record in records],
+                         sorted((record['timestamp'] for record in records), key=parse_epoch))
+
+
+if __name__ == '__main__':
+    unittest.main()